@@ -6,13 +6,17 @@ from pydantic import BaseModel
 from typing import Optional, List
 import asyncio
 import logging
+import os
 from pathlib import Path
-import hashlib
+import zlib
+from functools import lru_cache
+from contextlib import asynccontextmanager
 
 from modules.fetcher import DocumentationFetcher
 from modules.parser import ContentParser
 from modules.translator import TranslationEngine
 from modules.builder import StaticSiteBuilder
+from modules.status_store import StatusStore
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 FRONTEND_DIR = BASE_DIR / "frontend"
@@ -20,7 +24,45 @@ FRONTEND_DIR = BASE_DIR / "frontend"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Documentation Translation System", version="1.0.0")
+fetcher = DocumentationFetcher()
+parser = ContentParser()
+translator = TranslationEngine()
+builder = StaticSiteBuilder()
+
+status_store = StatusStore()
+
+# Maximum number of document groups translated at the same time
+TRANSLATION_CONCURRENCY = 8
+# Documents whose blocks are pooled into the same translation batches
+TRANSLATION_GROUP_SIZE = 4
+# Seconds between sweeps that evict expired or excess project status
+STATUS_PRUNE_INTERVAL = 3600
+
+
+async def prune_status_periodically():
+    """Keep the status store bounded for long-running servers"""
+    while True:
+        try:
+            removed = await status_store.prune()
+            if removed:
+                logger.info(f"Pruned {removed} status entries")
+        except Exception as e:
+            logger.error(f"Status prune error: {e}")
+        await asyncio.sleep(STATUS_PRUNE_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open long-lived resources shared across requests and release them on shutdown"""
+    await fetcher.startup()
+    prune_task = asyncio.create_task(prune_status_periodically())
+    yield
+    prune_task.cancel()
+    await fetcher.shutdown()
+    await asyncio.to_thread(parser.shutdown)
+
+
+app = FastAPI(title="Documentation Translation System", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,13 +72,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-fetcher = DocumentationFetcher()
-parser = ContentParser()
-translator = TranslationEngine()
-builder = StaticSiteBuilder()
-
-processing_status = {}
-
 
 class FetchRequest(BaseModel):
     url: str
@@ -61,6 +96,19 @@ class BuildRequest(BaseModel):
     create_package: bool = True
 
 
+@lru_cache(maxsize=1024)
+def make_project_id(url: str) -> str:
+    """Derive a stable, short project identifier from a source URL"""
+    url_clean = url.rstrip('/').replace('.git', '')
+    url_hash = f"{zlib.crc32(url_clean.encode()):08x}"
+    project_id = f"{url_clean.split('/')[-1].replace('.', '_')}_{url_hash}"
+    
+    if not project_id or project_id == f"_{url_hash}":
+        project_id = f"project_{url_hash}"
+    
+    return project_id
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -90,18 +138,13 @@ async def fetch_documentation(request: FetchRequest, background_tasks: Backgroun
     Fetch documentation from GitHub or website
     """
     try:
-        url_clean = request.url.rstrip('/').replace('.git', '')
-        url_hash = hashlib.md5(url_clean.encode()).hexdigest()[:8]
-        project_id = f"{url_clean.split('/')[-1].replace('.', '_')}_{url_hash}"
+        project_id = make_project_id(request.url)
         
-        if not project_id or project_id == f"_{url_hash}":
-            project_id = f"project_{url_hash}"
-        
-        processing_status[project_id] = {
+        await status_store.set(project_id, {
             "status": "fetching",
             "progress": 0,
             "message": "Fetching documentation..."
-        }
+        })
         
         if request.source_type == "github":
             result = await fetcher.fetch_github_repo(request.url, request.target_path)
@@ -112,12 +155,12 @@ async def fetch_documentation(request: FetchRequest, background_tasks: Backgroun
             raise HTTPException(status_code=400, detail="Invalid source type")
         
         if result.get("status") == "success":
-            processing_status[project_id] = {
+            await status_store.set(project_id, {
                 "status": "fetched",
                 "progress": 33,
                 "message": f"Fetched {result.get('file_count', result.get('page_count', 0))} files",
                 "data": result
-            }
+            })
             
             return {
                 "status": "success",
@@ -125,10 +168,10 @@ async def fetch_documentation(request: FetchRequest, background_tasks: Backgroun
                 "result": result
             }
         else:
-            processing_status[project_id] = {
+            await status_store.set(project_id, {
                 "status": "error",
                 "message": result.get("message", "Unknown error")
-            }
+            })
             raise HTTPException(status_code=500, detail=result.get("message"))
             
     except Exception as e:
@@ -143,15 +186,15 @@ async def parse_documentation(request: ParseRequest):
     """
     try:
         project_id = request.project_id
-        if project_id not in processing_status:
+        project_status = await status_store.get(project_id)
+        if project_status is None:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        project_data = processing_status[project_id].get("data")
+        project_data = project_status.get("data")
         if not project_data:
             raise HTTPException(status_code=400, detail="No data to parse")
         
-        processing_status[project_id]["status"] = "parsing"
-        processing_status[project_id]["message"] = "Parsing documentation..."
+        await status_store.update(project_id, status="parsing", message="Parsing documentation...")
         
         files = project_data.get("files", [])
         if not files:
@@ -160,16 +203,18 @@ async def parse_documentation(request: ParseRequest):
         
         file_paths = [f["path"] for f in files[:50]]
         
-        parsed_results = []
-        for file_path in file_paths:
-            parsed = parser.parse_file(file_path)
-            if parsed.get("status") == "success":
-                parsed_results.append(parsed)
+        parsed_files = await asyncio.gather(
+            *(asyncio.to_thread(parser.parse_file, file_path) for file_path in file_paths)
+        )
+        parsed_results = [parsed for parsed in parsed_files if parsed.get("status") == "success"]
         
-        processing_status[project_id]["parsed_data"] = parsed_results
-        processing_status[project_id]["status"] = "parsed"
-        processing_status[project_id]["progress"] = 50
-        processing_status[project_id]["message"] = f"Parsed {len(parsed_results)} files"
+        await status_store.update(
+            project_id,
+            parsed_data=parsed_results,
+            status="parsed",
+            progress=50,
+            message=f"Parsed {len(parsed_results)} files"
+        )
         
         return {
             "status": "success",
@@ -188,15 +233,14 @@ async def translate_documentation(request: TranslateRequest):
     Translate parsed documentation
     """
     try:
-        if request.project_id not in processing_status:
+        project_status = await status_store.get(request.project_id)
+        if project_status is None:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        project_status = processing_status[request.project_id]
-        
         if "parsed_data" not in project_status:
             try:
                 await parse_documentation(ParseRequest(project_id=request.project_id))
-                project_status = processing_status[request.project_id]
+                project_status = await status_store.get(request.project_id) or {}
             except HTTPException as e:
                 raise HTTPException(status_code=e.status_code, detail=f"Parse failed: {e.detail}")
         
@@ -204,29 +248,48 @@ async def translate_documentation(request: TranslateRequest):
         if not parsed_data:
             raise HTTPException(status_code=400, detail="No parsed data available")
         
-        processing_status[request.project_id]["status"] = "translating"
-        processing_status[request.project_id]["message"] = f"Translating to {request.target_lang}..."
+        await status_store.update(
+            request.project_id,
+            status="translating",
+            message=f"Translating to {request.target_lang}..."
+        )
         
-        translated_results = []
         total = len(parsed_data)
+        completed = 0
+        semaphore = asyncio.Semaphore(TRANSLATION_CONCURRENCY)
         
-        for i, parsed_doc in enumerate(parsed_data):
-            translated = await translator.translate_document(
-                parsed_doc,
-                request.source_lang,
-                request.target_lang
-            )
-            translated_results.append(translated)
+        async def translate_group(group):
+            nonlocal completed
+            async with semaphore:
+                translated = await translator.translate_documents(
+                    group,
+                    request.source_lang,
+                    request.target_lang
+                )
+                completed += len(group)
             
-            progress = 50 + int((i + 1) / total * 30)
-            processing_status[request.project_id]["progress"] = progress
-            processing_status[request.project_id]["message"] = f"Translating... ({i+1}/{total})"
+            await status_store.update(
+                request.project_id,
+                progress=50 + int(completed / total * 30),
+                message=f"Translating... ({completed}/{total})"
+            )
+            return translated
         
-        processing_status[request.project_id]["translated_data"] = translated_results
-        processing_status[request.project_id]["status"] = "translated"
-        processing_status[request.project_id]["progress"] = 80
-        processing_status[request.project_id]["target_lang"] = request.target_lang
-        processing_status[request.project_id]["message"] = f"Translated {len(translated_results)} documents"
+        groups = [
+            parsed_data[i:i + TRANSLATION_GROUP_SIZE]
+            for i in range(0, total, TRANSLATION_GROUP_SIZE)
+        ]
+        translated_groups = await asyncio.gather(*(translate_group(group) for group in groups))
+        translated_results = [doc for group in translated_groups for doc in group]
+        
+        await status_store.update(
+            request.project_id,
+            translated_data=translated_results,
+            status="translated",
+            progress=80,
+            target_lang=request.target_lang,
+            message=f"Translated {len(translated_results)} documents"
+        )
         
         return {
             "status": "success",
@@ -246,20 +309,20 @@ async def build_site(request: BuildRequest):
     Build static site from translated documentation
     """
     try:
-        if request.project_id not in processing_status:
+        project_status = await status_store.get(request.project_id)
+        if project_status is None:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        project_status = processing_status[request.project_id]
         translated_data = project_status.get("translated_data")
         target_lang = project_status.get("target_lang", "es")
         
         if not translated_data:
             raise HTTPException(status_code=400, detail="No translated data available")
         
-        processing_status[request.project_id]["status"] = "building"
-        processing_status[request.project_id]["message"] = "Building static site..."
+        await status_store.update(request.project_id, status="building", message="Building static site...")
         
-        build_result = builder.build_site(
+        build_result = await asyncio.to_thread(
+            builder.build_site,
             request.project_name,
             translated_data,
             target_lang
@@ -270,18 +333,24 @@ async def build_site(request: BuildRequest):
         
         package_result = None
         if request.create_package:
-            processing_status[request.project_id]["message"] = "Creating downloadable package..."
-            package_result = builder.create_downloadable_package(
+            await status_store.update(request.project_id, message="Creating downloadable package...")
+            package_result = await asyncio.to_thread(
+                builder.create_downloadable_package,
                 build_result["site_dir"],
                 request.project_name,
                 target_lang
             )
         
-        processing_status[request.project_id]["status"] = "completed"
-        processing_status[request.project_id]["progress"] = 100
-        processing_status[request.project_id]["message"] = "Build completed!"
-        processing_status[request.project_id]["build_result"] = build_result
-        processing_status[request.project_id]["package_result"] = package_result
+        await status_store.update(
+            request.project_id,
+            status="completed",
+            progress=100,
+            message="Build completed!",
+            build_result=build_result,
+            package_result=package_result
+        )
+        # The site is on disk now; the full document contents are no longer needed
+        await status_store.delete_fields(request.project_id, "parsed_data", "translated_data")
         
         return {
             "status": "success",
@@ -298,10 +367,11 @@ async def build_site(request: BuildRequest):
 @app.get("/api/status/{project_id}")
 async def get_status(project_id: str):
     """Get project processing status"""
-    if project_id not in processing_status:
+    project_status = await status_store.get(project_id)
+    if project_status is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    return processing_status[project_id]
+    return project_status
 
 
 @app.get("/api/download/{filename}")
@@ -322,6 +392,7 @@ async def download_file(filename: str):
 @app.get("/api/projects")
 async def list_projects():
     """List all projects"""
+    projects = await status_store.list_summaries()
     return {
         "status": "success",
         "projects": [
@@ -330,7 +401,7 @@ async def list_projects():
                 "status": data.get("status"),
                 "message": data.get("message")
             }
-            for pid, data in processing_status.items()
+            for pid, data in projects.items()
         ]
     }
 
@@ -350,4 +421,15 @@ async def serve_app():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5000)
+    workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+    # Workers inherit this, so each one knows how many CPU threads it may use for translation
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=5000,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        access_log=False
+    )
@@ -1,8 +1,10 @@
 import os
+import html
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from jinja2 import Template, Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound
 from typing import Dict, List, Optional
 import logging
 
@@ -24,7 +26,30 @@ class StaticSiteBuilder:
         self.output_dir.mkdir(exist_ok=True, parents=True)
         self.template_dir.mkdir(exist_ok=True, parents=True)
         
-        self.env = Environment(loader=FileSystemLoader(str(self.template_dir)))
+        bytecode_cache_dir = self.output_dir / ".jinja_cache"
+        bytecode_cache_dir.mkdir(exist_ok=True)
+        
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_cache_dir))
+        )
+        
+        self._document_template = self._load_template("document.html", self._get_default_document_template())
+        self._index_template = self._load_template("index.html", self._get_default_index_template())
+        
+        # A style.css placed in the template directory overrides the built-in stylesheet
+        css_override = self.template_dir / "style.css"
+        if css_override.is_file():
+            self._css_bytes = css_override.read_bytes()
+        else:
+            self._css_bytes = self._get_default_css().encode('utf-8')
+    
+    def _load_template(self, name: str, default_source: str):
+        """Load a template from the template directory, falling back to a built-in default"""
+        try:
+            return self.env.get_template(name)
+        except TemplateNotFound:
+            return self.env.from_string(default_source)
     
     def build_site(self, project_name: str, translated_documents: List[Dict], 
                    target_lang: str, source_lang: str = "en") -> Dict:
@@ -47,26 +72,12 @@ class StaticSiteBuilder:
             
             site_dir.mkdir(parents=True, exist_ok=True)
             
-            pages = []
-            for doc in translated_documents:
-                if doc.get("status") != "success":
-                    continue
-                
-                translated_content = doc.get("translated_content", {})
-                file_path = translated_content.get("file_path", "")
-                
-                html_content = self._render_document(translated_content, target_lang)
-                
-                file_name = Path(file_path).stem if file_path else "index"
-                output_file = site_dir / f"{file_name}.html"
-                output_file.write_text(html_content, encoding='utf-8')
-                
-                pages.append({
-                    "file": str(output_file.relative_to(self.output_dir)),
-                    "title": file_name.replace('_', ' ').title()
-                })
-                
-                logger.info(f"Generated: {output_file.name}")
+            documents = [doc for doc in translated_documents if doc.get("status") == "success"]
+            with ThreadPoolExecutor() as executor:
+                pages = list(executor.map(
+                    lambda doc: self._render_and_write(doc, site_dir, target_lang),
+                    documents
+                ))
             
             self._create_index_page(site_dir, pages, project_name, target_lang)
             
@@ -85,25 +96,41 @@ class StaticSiteBuilder:
             logger.error(f"Site building error: {e}")
             return {"status": "error", "message": str(e)}
     
+    def _render_and_write(self, doc: Dict, site_dir: Path, target_lang: str) -> Dict:
+        """Render a translated document and write it into the site directory"""
+        translated_content = doc.get("translated_content", {})
+        file_path = translated_content.get("file_path", "")
+        
+        html_content = self._render_document(translated_content, target_lang)
+        
+        file_name = Path(file_path).stem if file_path else "index"
+        output_file = site_dir / f"{file_name}.html"
+        output_file.write_text(html_content, encoding='utf-8')
+        
+        logger.info(f"Generated: {output_file.name}")
+        
+        return {
+            "file": str(output_file.relative_to(self.output_dir)),
+            "title": file_name.replace('_', ' ').title()
+        }
+    
     def _render_document(self, translated_content: Dict, target_lang: str) -> str:
         """Render a single document to HTML"""
-        try:
-            template = self.env.get_template("document.html")
-        except:
-            template = Template(self._get_default_document_template())
+        template = self._document_template
         
-        translatable_blocks = translated_content.get("translatable_blocks", [])
+        block_contents = translated_content.get("block_contents", [])
+        translated_contents = translated_content.get("translated_contents", [])
         code_blocks = translated_content.get("code_blocks", [])
         metadata = translated_content.get("metadata", {})
         
-        content_html = ""
-        for block in translatable_blocks:
-            text = block.get("translated_content", block.get("content", ""))
-            content_html += f"<p>{text}</p>\n"
-        
-        for code_block in code_blocks:
-            code_content = code_block.get("content", "")
-            content_html += f'<pre><code>{code_content}</code></pre>\n'
+        # Blocks without a translation keep their original text
+        texts = translated_contents[:len(block_contents)] + block_contents[len(translated_contents):]
+        parts = [f"<p>{html.escape(text)}</p>\n" for text in texts]
+        parts.extend(
+            f"<pre><code>{html.escape(code_block.get('content', ''))}</code></pre>\n"
+            for code_block in code_blocks
+        )
+        content_html = "".join(parts)
         
         title = metadata.get("title", "Documentation")
         
@@ -117,19 +144,16 @@ class StaticSiteBuilder:
     def _create_index_page(self, site_dir: Path, pages: List[Dict], 
                           project_name: str, language: str):
         """Create an index page linking to all documents"""
-        try:
-            template = self.env.get_template("index.html")
-        except:
-            template = Template(self._get_default_index_template())
+        template = self._index_template
         
-        html = template.render(
+        index_html = template.render(
             project_name=project_name,
             language=language,
             pages=pages
         )
         
         index_file = site_dir / "index.html"
-        index_file.write_text(html, encoding='utf-8')
+        index_file.write_text(index_html, encoding='utf-8')
         logger.info("Created index page")
     
     def _copy_assets(self, site_dir: Path):
@@ -137,9 +161,7 @@ class StaticSiteBuilder:
         assets_dir = site_dir / "assets"
         assets_dir.mkdir(exist_ok=True)
         
-        css_content = self._get_default_css()
-        css_file = assets_dir / "style.css"
-        css_file.write_text(css_content)
+        (assets_dir / "style.css").write_bytes(self._css_bytes)
     
     def _get_default_document_template(self) -> str:
         """Get default document template"""
@@ -324,11 +346,13 @@ footer a:hover {
             zip_name = f"{project_name}_{language}_docs.zip"
             zip_path = downloads_dir / zip_name
             
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            # Site files are small text; the fastest deflate level loses little size
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
                 site_path = Path(site_dir)
-                for file_path in site_path.rglob('*'):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(site_path.parent)
+                for root, _, file_names in os.walk(site_path):
+                    for file_name in file_names:
+                        file_path = os.path.join(root, file_name)
+                        arcname = os.path.relpath(file_path, site_path.parent)
                         zipf.write(file_path, arcname)
             
             file_size = zip_path.stat().st_size
@@ -1,24 +1,64 @@
 import asyncio
 import aiohttp
-import requests
-from bs4 import BeautifulSoup
+import aiofiles
+from bs4 import BeautifulSoup, SoupStrainer
 from git import Repo
 import os
+import stat
 import shutil
 from pathlib import Path
-from typing import List, Dict, Optional
+from urllib.parse import urldefrag, urlparse
+from typing import Iterator, List, Dict, Optional, Tuple
 import logging
 
+from .http_cache import HttpCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Only <title> and <a> are read from crawled pages, so skip building the rest of the tree
+_PAGE_STRAINER = SoupStrainer(['a', 'title'])
+
+# Pages are streamed to disk in chunks; only the leading bytes are kept for link extraction
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+_PARSE_HEAD_LIMIT = 256_000
+
+# Throttling and transient server errors are retried with backoff instead of dropping the page
+_RETRY_STATUSES = {429, 502, 503, 504}
+_MAX_RETRIES = 3
+_MAX_RETRY_DELAY = 60.0
+
 
 class DocumentationFetcher:
     """Fetches documentation from GitHub repositories or live websites"""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", max_concurrency: int = 16,
+                 per_host_concurrency: int = 4):
         self.output_dir = Path(output_dir).resolve()
         self.output_dir.mkdir(exist_ok=True, parents=True)
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.http_cache = HttpCache(str(self.output_dir / "http_cache.db"))
+    
+    async def startup(self):
+        """Open the shared HTTP session used for all crawls"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+    
+    async def shutdown(self):
+        """Close the shared HTTP session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self._host_semaphores.clear()
         
     async def fetch_github_repo(self, repo_url: str, target_path: Optional[str] = None) -> Dict:
         """
@@ -36,12 +76,19 @@ class DocumentationFetcher:
             clone_path = self.output_dir / f"repos/{repo_name}"
             
             if clone_path.exists():
-                shutil.rmtree(clone_path)
+                await asyncio.to_thread(shutil.rmtree, clone_path)
             
             clone_path.parent.mkdir(parents=True, exist_ok=True)
             
             logger.info(f"Cloning repository: {repo_url}")
-            Repo.clone_from(repo_url, str(clone_path))
+            await asyncio.to_thread(
+                Repo.clone_from,
+                repo_url,
+                str(clone_path),
+                depth=1,
+                single_branch=True,
+                no_tags=True
+            )
             
             if target_path:
                 docs_path = clone_path / target_path
@@ -54,7 +101,7 @@ class DocumentationFetcher:
                 else:
                     docs_path = clone_path
             
-            files = self._collect_documentation_files(docs_path)
+            files = await asyncio.to_thread(self._collect_documentation_files, docs_path)
             
             return {
                 "status": "success",
@@ -86,11 +133,40 @@ class DocumentationFetcher:
             site_path = self.output_dir / f"sites/{site_name}"
             site_path.mkdir(parents=True, exist_ok=True)
             
-            visited_urls = set()
+            visited_urls = {url}
             pages = []
+            queue: asyncio.Queue = asyncio.Queue()
+            queue.put_nowait(url)
             
-            async with aiohttp.ClientSession() as session:
-                await self._crawl_page(session, url, url, visited_urls, pages, max_pages, site_path)
+            await self.startup()
+            session = self.session
+            
+            async def crawl_worker():
+                while True:
+                    page_url = await queue.get()
+                    try:
+                        page, links = await self._fetch_one(session, page_url, url, site_path)
+                        if page is not None:
+                            pages.append(page)
+                        
+                        for next_url in links:
+                            if len(visited_urls) >= max_pages:
+                                break
+                            if next_url in visited_urls or not next_url.startswith(url):
+                                continue
+                            visited_urls.add(next_url)
+                            queue.put_nowait(next_url)
+                    finally:
+                        queue.task_done()
+            
+            workers = [
+                asyncio.create_task(crawl_worker())
+                for _ in range(max(1, min(self.max_concurrency, max_pages)))
+            ]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
             
             return {
                 "status": "success",
@@ -104,71 +180,145 @@ class DocumentationFetcher:
             logger.error(f"Error fetching website: {e}")
             return {"status": "error", "message": str(e)}
     
-    async def _crawl_page(self, session, url: str, base_url: str, visited: set, 
-                          pages: list, max_pages: int, output_path: Path):
-        """Recursively crawl website pages"""
-        if len(visited) >= max_pages or url in visited:
-            return
-        
-        if not url.startswith(base_url):
-            return
-        
-        visited.add(url)
-        
+    async def _fetch_one(self, session, url: str, base_url: str,
+                         output_path: Path) -> Tuple[Optional[Dict], List[str]]:
+        """Download a single page and return its page record and the links found on it"""
         try:
-            async with session.get(url, timeout=10) as response:
-                if response.status != 200:
-                    return
-                
-                content = await response.text()
-                soup = BeautifulSoup(content, 'lxml')
-                
-                page_name = url.replace(base_url, '').strip('/').replace('/', '_') or 'index'
-                if not page_name.endswith('.html'):
-                    page_name += '.html'
-                
-                file_path = output_path / page_name
-                file_path.write_text(content, encoding='utf-8')
-                
-                pages.append({
-                    "url": url,
-                    "file_path": str(file_path),
-                    "title": soup.title.string if soup.title else page_name
-                })
-                
-                logger.info(f"Downloaded: {url}")
-                
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href', '')
-                    if not isinstance(href, str):
-                        continue
-                    
-                    if href.startswith('/'):
-                        next_url = base_url.rstrip('/') + href
-                    elif href.startswith('http'):
-                        next_url = href
-                    else:
-                        next_url = url.rstrip('/') + '/' + href
+            page_name = url.replace(base_url, '').strip('/').replace('/', '_') or 'index'
+            if not page_name.endswith('.html'):
+                page_name += '.html'
+            
+            file_path = output_path / page_name
+            
+            cached = await self.http_cache.get(url)
+            headers = {}
+            if cached:
+                if cached["etag"]:
+                    headers["If-None-Match"] = cached["etag"]
+                if cached["last_modified"]:
+                    headers["If-Modified-Since"] = cached["last_modified"]
+            
+            host = urlparse(url).netloc
+            semaphore = self._host_semaphores.setdefault(
+                host, asyncio.Semaphore(self.per_host_concurrency)
+            )
+            
+            async with semaphore:
+                for attempt in range(_MAX_RETRIES + 1):
+                    async with session.get(url, timeout=10, headers=headers) as response:
+                        retry_delay = self._retry_delay(response, attempt)
+                        if retry_delay is None:
+                            return await self._read_page(
+                                response, url, base_url, page_name, file_path, cached if headers else None
+                            )
+                        status = response.status
                     
-                    if len(visited) < max_pages:
-                        await self._crawl_page(session, next_url, base_url, visited, 
-                                               pages, max_pages, output_path)
+                    logger.info(f"HTTP {status} for {url}, retrying in {retry_delay:.0f}s")
+                    await asyncio.sleep(retry_delay)
                         
         except Exception as e:
             logger.warning(f"Error crawling {url}: {e}")
+        
+        return None, []
+    
+    def _retry_delay(self, response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a throttled or failed request, or None to stop"""
+        if response.status not in _RETRY_STATUSES or attempt >= _MAX_RETRIES:
+            return None
+        
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), _MAX_RETRY_DELAY)
+        return float(2 ** attempt)
+    
+    async def _read_page(self, response, url: str, base_url: str, page_name: str, file_path: Path,
+                         cached: Optional[Dict]) -> Tuple[Optional[Dict], List[str]]:
+        """Store a page response on disk (or reuse the cached copy) and extract its links"""
+        links = []
+        
+        if response.status == 304 and cached:
+            file_path = Path(cached["path"])
+            async with aiofiles.open(file_path, 'rb') as f:
+                head = await f.read(_PARSE_HEAD_LIMIT)
+            from_cache = True
+        elif response.status == 200:
+            head = bytearray()
+            async with aiofiles.open(file_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+                    if len(head) < _PARSE_HEAD_LIMIT:
+                        head.extend(chunk)
+            from_cache = False
+            
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                await self.http_cache.put(url, etag, last_modified, str(file_path))
+        else:
+            logger.warning(f"Skipping {url}: HTTP {response.status}")
+            return None, links
+        
+        soup = BeautifulSoup(bytes(head), 'lxml', parse_only=_PAGE_STRAINER,
+                             from_encoding=response.charset)
+        
+        page = {
+            "url": url,
+            "file_path": str(file_path),
+            "title": soup.title.string if soup.title else page_name,
+            "cached": from_cache
+        }
+        
+        logger.info(f"{'Unchanged' if from_cache else 'Downloaded'}: {url}")
+        
+        for link in soup.find_all('a', href=True):
+            href = link.get('href', '')
+            if not isinstance(href, str):
+                continue
+            
+            # Anchors point into a page we already know about; strip them so
+            # "page#a" and "page#b" are enqueued once as "page"
+            href = urldefrag(href).url
+            if not href:
+                continue
+            
+            if href.startswith('/'):
+                links.append(base_url.rstrip('/') + href)
+            elif href.startswith('http'):
+                links.append(href)
+            else:
+                links.append(url.rstrip('/') + '/' + href)
+        
+        return page, links
     
     def _collect_documentation_files(self, path: Path) -> List[Dict]:
         """Collect all documentation files from a directory"""
-        files = []
+        return list(self._iter_documentation_files(path))
+    
+    def _iter_documentation_files(self, path: Path) -> Iterator[Dict]:
+        """Lazily yield documentation files, only stat-ing files with a doc extension"""
         doc_extensions = {'.md', '.rst', '.html', '.txt'}
         
-        for file_path in path.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in doc_extensions:
-                files.append({
+        for root, dir_names, file_names in os.walk(path):
+            # Git metadata never holds documentation and is often the bulk of a clone
+            dir_names[:] = [d for d in dir_names if d != '.git']
+            
+            for file_name in file_names:
+                extension = os.path.splitext(file_name)[1]
+                if extension.lower() not in doc_extensions:
+                    continue
+                
+                file_path = Path(root) / file_name
+                # One stat serves both the regular-file check and the size
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(file_stat.st_mode):
+                    continue
+                
+                yield {
                     "path": str(file_path),
                     "relative_path": str(file_path.relative_to(path)),
-                    "extension": file_path.suffix,
-                    "size": file_path.stat().st_size
-                })
-        
-        return files
+                    "extension": extension,
+                    "size": file_stat.st_size
+                }
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class HttpCache:
+    """Remembers ETag / Last-Modified validators of downloaded pages for conditional re-fetches"""
+    
+    def __init__(self, db_path: str = "output/http_cache.db"):
+        self.db_path = Path(db_path).resolve()
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS http_pages (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                )"""
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+    
+    async def get(self, url: str) -> Optional[Dict]:
+        """
+        Get the cached validators for a URL
+        
+        Several URLs can map to the same file (e.g. crawls from different base URLs), so
+        the stored copy is only trusted while its size and mtime match what was written.
+        
+        Args:
+            url: Page URL
+        
+        Returns:
+            Dict with etag, last_modified and path, or None if the URL is not cached
+            or its stored copy has changed since
+        """
+        return await asyncio.to_thread(self._get, url)
+    
+    async def put(self, url: str, etag: Optional[str], last_modified: Optional[str], path: str):
+        """Store the validators and on-disk location of a page that was just written to path"""
+        await asyncio.to_thread(self._put, url, etag, last_modified, path)
+    
+    def _get(self, url: str) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, path, size, mtime_ns FROM http_pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        etag, last_modified, path, size, mtime_ns = row
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        if file_stat.st_size != size or file_stat.st_mtime_ns != mtime_ns:
+            return None
+        
+        return {"etag": etag, "last_modified": last_modified, "path": path}
+    
+    def _put(self, url: str, etag: Optional[str], last_modified: Optional[str], path: str):
+        file_stat = os.stat(path)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO http_pages (url, etag, last_modified, path, size, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, path, file_stat.st_size, file_stat.st_mtime_ns)
+            )
@@ -1,39 +1,175 @@
 import re
-import markdown
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import frontmatter
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import json
 import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Single-pass Markdown tokenizer: code spans/fences, blank lines, line breaks and runs of text
+_MD_SCANNER = re.compile(
+    r'(?P<fence>```[\s\S]*?```)'
+    r'|(?P<inline>`[^`]+`)'
+    r'|(?P<blank>\n[ \t]*\n)'
+    r'|(?P<newline>\n)'
+    r'|(?P<text>[^`\n]+|`)'
+)
+_HTML_TEXT_XPATH = '|'.join(
+    f'//{tag}' for tag in ('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'td', 'th', 'div')
+)
+# Paragraphs are separated by blank (whitespace-only) lines; the line breaks inside a
+# paragraph, with the whitespace around them, collapse to a single space
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+_LINE_BREAK_RE = re.compile(r'[^\S\n]*\n[^\S\n]*')
+# Opening fence of a YAML/TOML/JSON front-matter header; anything else cannot carry one
+_FRONTMATTER_START_RE = re.compile(r'\s*(?:-{3,}|\+{3,}|[{}])[^\S\n]*$', re.MULTILINE)
+_RST_CODE_RE = re.compile(r'\.\. code-block::[\s\S]*?(?=\n\n|\Z)|::\n\n(?: {4}.*\n)+')
+
+# lxml parser objects must not be shared between threads, and files are parsed in a threadpool
+_thread_local = threading.local()
+
+
+def _html_parser() -> etree.HTMLParser:
+    """Get this thread's HTML parser"""
+    parser = getattr(_thread_local, 'html_parser', None)
+    if parser is None:
+        parser = _thread_local.html_parser = etree.HTMLParser(encoding='utf-8')
+    return parser
+
+
+# Batches with fewer uncached files than this are parsed in-process; the round-trip
+# to the worker processes would cost more than it saves
+_PARALLEL_BATCH_THRESHOLD = 4
+# Never fork the (multi-threaded) server process itself to start parse workers
+_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+_worker_parser = None
+
+
+def _parse_one(file_path: str) -> Dict:
+    """Parse a file in a worker process, reusing one ContentParser per process"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ContentParser(cache_size=0)
+    return _worker_parser._parse_uncached(file_path)
+
+
+def _read_text(path: Path) -> str:
+    """Read a UTF-8 file with newlines normalised to '\\n'"""
+    content = path.read_bytes().decode('utf-8')
+    if '\r' in content:
+        # read_text() used to translate newlines; the block patterns expect '\n'
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
 
 class ContentParser:
     """Parses documentation content and extracts translatable text"""
     
-    def __init__(self):
-        self.md = markdown.Markdown(extensions=['fenced_code', 'codehilite', 'tables'])
-        
+    def __init__(self, cache_size: int = 512):
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
     def parse_file(self, file_path: str) -> Dict:
         """
         Parse a documentation file and extract translatable content
         
+        Results are cached per (path, mtime, size), so unchanged files are not re-parsed.
+        Cached results are shared between callers and must not be mutated.
+        
         Args:
             file_path: Path to the documentation file
             
         Returns:
             Dict containing parsed content with metadata
         """
-        path = Path(file_path)
+        key, error = self._cache_key(file_path)
+        if error is not None:
+            return error
         
-        if not path.exists():
-            return {"status": "error", "message": "File not found"}
+        result = self._cache_get(key)
+        if result is None:
+            result = self._parse_uncached(file_path)
+            self._cache_put(key, result)
+        return result
+    
+    def cache_info(self) -> Dict:
+        """Get hit/miss counters and the current size of the parse cache"""
+        with self._cache_lock:
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "size": len(self._cache),
+                "max_size": self.cache_size
+            }
+    
+    def shutdown(self):
+        """Stop the worker processes used by parse_batch"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+    
+    @staticmethod
+    def _cache_key(file_path: str) -> Tuple[Optional[Tuple], Optional[Dict]]:
+        """Get the (path, mtime, size) cache key of a file, or the error result if it cannot be stat'ed"""
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None, {"status": "error", "message": "File not found"}
+        except OSError as e:
+            logger.error(f"Error parsing file {file_path}: {e}")
+            return None, {"status": "error", "message": str(e)}
+        return (file_path, stat.st_mtime_ns, stat.st_size), None
+    
+    def _cache_get(self, key: Tuple) -> Optional[Dict]:
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                self._cache_misses += 1
+            else:
+                self._cache_hits += 1
+                self._cache.move_to_end(key)
+            return result
+    
+    def _cache_put(self, key: Tuple, result: Dict):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the long-lived worker pool, starting it on first use"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1, mp_context=_POOL_CONTEXT
+                )
+            return self._executor
+    
+    def _parse_uncached(self, file_path: str) -> Dict:
+        """Parse a file without consulting the cache"""
+        path = Path(file_path)
         
         try:
-            content = path.read_text(encoding='utf-8')
+            content = _read_text(path)
             
             if path.suffix == '.md':
                 return self._parse_markdown(content, file_path)
@@ -48,91 +184,125 @@ class ContentParser:
             logger.error(f"Error parsing file {file_path}: {e}")
             return {"status": "error", "message": str(e)}
     
+    @staticmethod
+    def get_original(result: Dict) -> str:
+        """
+        Re-read the source text of a parse result
+        
+        Parse results only reference their file instead of carrying a copy of its content.
+        
+        Args:
+            result: Successful result of parse_file
+            
+        Returns:
+            The file content as parsed
+        """
+        return _read_text(Path(result["file_path"]))
+    
     def _parse_markdown(self, content: str, file_path: str) -> Dict:
         """Parse Markdown content"""
-        post = frontmatter.loads(content)
-        
-        metadata = dict(post.metadata) if post.metadata else {}
-        body = post.content
+        if _FRONTMATTER_START_RE.match(content):
+            post = frontmatter.loads(content)
+            metadata = dict(post.metadata) if post.metadata else {}
+            body = post.content
+        else:
+            # Same result frontmatter.loads gives for a document without a header
+            metadata = {}
+            body = content.strip()
         
-        translatable_blocks = []
+        block_contents = []
         code_blocks = []
+        paragraph = []
+        line = []
         
-        code_pattern = r'```[\s\S]*?```|`[^`]+`'
-        code_matches = list(re.finditer(code_pattern, body))
-        
-        current_pos = 0
-        for match in code_matches:
-            if match.start() > current_pos:
-                text = body[current_pos:match.start()].strip()
-                if text:
-                    translatable_blocks.extend(self._split_into_blocks(text))
+        for match in _MD_SCANNER.finditer(body):
+            kind = match.lastgroup
+            if kind == 'text':
+                line.append(match.group())
+                continue
             
-            code_blocks.append({
-                "type": "code",
-                "content": match.group(),
-                "position": match.start()
-            })
-            current_pos = match.end()
+            line_text = ''.join(line).strip()
+            line = []
+            if line_text:
+                paragraph.append(line_text)
+                if kind == 'newline':
+                    continue
+            elif kind == 'newline' and not paragraph:
+                continue
+            
+            if paragraph:
+                block_contents.append(' '.join(paragraph))
+                paragraph = []
+            
+            if kind in ('fence', 'inline'):
+                code_blocks.append({
+                    "type": "code",
+                    "content": match.group(),
+                    "position": match.start()
+                })
         
-        if current_pos < len(body):
-            text = body[current_pos:].strip()
-            if text:
-                translatable_blocks.extend(self._split_into_blocks(text))
+        line_text = ''.join(line).strip()
+        if line_text:
+            paragraph.append(line_text)
+        if paragraph:
+            block_contents.append(' '.join(paragraph))
         
         return {
             "status": "success",
             "file_path": file_path,
             "file_type": "markdown",
             "metadata": metadata,
-            "translatable_blocks": translatable_blocks,
+            "block_types": ["text"] * len(block_contents),
+            "block_contents": block_contents,
             "code_blocks": code_blocks,
-            "total_blocks": len(translatable_blocks),
-            "original_content": content
+            "total_blocks": len(block_contents)
         }
     
     def _parse_html(self, content: str, file_path: str) -> Dict:
         """Parse HTML content"""
-        soup = BeautifulSoup(content, 'lxml')
+        block_contents = []
+        block_tags = []
         
-        for script in soup(['script', 'style', 'code', 'pre']):
-            script.decompose()
+        tree = None
+        if content.strip():
+            try:
+                tree = lxml_html.document_fromstring(content.encode('utf-8'), parser=_html_parser())
+            except etree.ParserError:
+                # No elements at all (e.g. only a comment or doctype): nothing to translate
+                tree = None
         
-        translatable_blocks = []
-        
-        for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'td', 'th', 'div']):
-            text = element.get_text(strip=True)
-            if text and len(text) > 3:
-                translatable_blocks.append({
-                    "type": "text",
-                    "content": text,
-                    "tag": element.name
-                })
+        if tree is not None:
+            etree.strip_elements(tree, 'script', 'style', 'code', 'pre', with_tail=False)
+            
+            for element in tree.xpath(_HTML_TEXT_XPATH):
+                text = ' '.join(''.join(element.itertext()).split())
+                if text and len(text) > 3:
+                    block_contents.append(text)
+                    block_tags.append(element.tag)
         
         return {
             "status": "success",
             "file_path": file_path,
             "file_type": "html",
-            "translatable_blocks": translatable_blocks,
-            "total_blocks": len(translatable_blocks),
-            "original_content": content
+            "block_types": ["text"] * len(block_contents),
+            "block_contents": block_contents,
+            "block_tags": block_tags,
+            "total_blocks": len(block_contents)
         }
     
     def _parse_restructured_text(self, content: str, file_path: str) -> Dict:
         """Parse reStructuredText content"""
-        code_pattern = r'\.\. code-block::[\s\S]*?(?=\n\n|\Z)|::\n\n(?: {4}.*\n)+'
-        
-        translatable_blocks = []
+        block_contents = []
         code_blocks = []
         
-        code_matches = list(re.finditer(code_pattern, content))
+        code_matches = list(_RST_CODE_RE.finditer(content))
         
         current_pos = 0
         for match in code_matches:
             if match.start() > current_pos:
                 text = content[current_pos:match.start()].strip()
                 if text:
-                    translatable_blocks.extend(self._split_into_blocks(text))
+                    block_contents.extend(self._split_into_blocks(text))
             
             code_blocks.append({
                 "type": "code",
@@ -144,70 +314,69 @@ class ContentParser:
         if current_pos < len(content):
             text = content[current_pos:].strip()
             if text:
-                translatable_blocks.extend(self._split_into_blocks(text))
+                block_contents.extend(self._split_into_blocks(text))
         
         return {
             "status": "success",
             "file_path": file_path,
             "file_type": "restructuredtext",
-            "translatable_blocks": translatable_blocks,
+            "block_types": ["text"] * len(block_contents),
+            "block_contents": block_contents,
             "code_blocks": code_blocks,
-            "total_blocks": len(translatable_blocks),
-            "original_content": content
+            "total_blocks": len(block_contents)
         }
     
     def _parse_plain_text(self, content: str, file_path: str) -> Dict:
         """Parse plain text content"""
-        blocks = self._split_into_blocks(content)
+        block_contents = self._split_into_blocks(content)
         
         return {
             "status": "success",
             "file_path": file_path,
             "file_type": "text",
-            "translatable_blocks": blocks,
-            "total_blocks": len(blocks),
-            "original_content": content
+            "block_types": ["text"] * len(block_contents),
+            "block_contents": block_contents,
+            "total_blocks": len(block_contents)
         }
     
-    def _split_into_blocks(self, text: str) -> List[Dict]:
-        """Split text into translatable blocks (paragraphs, headings, etc.)"""
-        blocks = []
-        
-        lines = text.split('\n')
-        current_block = []
+    def _split_into_blocks(self, text: str) -> List[str]:
+        """Split text into the contents of translatable blocks (paragraphs, headings, etc.)"""
+        return [
+            block_text
+            for block_text in (
+                _LINE_BREAK_RE.sub(' ', segment.strip())
+                for segment in _PARAGRAPH_SPLIT_RE.split(text)
+            )
+            if block_text
+        ]
+    
+    def parse_batch(self, file_paths: List[str]) -> Dict:
+        """Parse multiple files, serving unchanged ones from the cache and spreading the rest across worker processes"""
+        results: List[Optional[Dict]] = [None] * len(file_paths)
+        misses = []
         
-        for line in lines:
-            line = line.strip()
+        for i, file_path in enumerate(file_paths):
+            key, error = self._cache_key(file_path)
+            if error is not None:
+                results[i] = error
+                continue
             
-            if not line:
-                if current_block:
-                    block_text = ' '.join(current_block)
-                    if block_text:
-                        blocks.append({
-                            "type": "text",
-                            "content": block_text
-                        })
-                    current_block = []
-            else:
-                current_block.append(line)
-        
-        if current_block:
-            block_text = ' '.join(current_block)
-            if block_text:
-                blocks.append({
-                    "type": "text",
-                    "content": block_text
-                })
+            results[i] = self._cache_get(key)
+            if results[i] is None:
+                misses.append((i, key))
         
-        return blocks
-    
-    def parse_batch(self, file_paths: List[str]) -> Dict:
-        """Parse multiple files"""
-        results = []
+        if len(misses) < _PARALLEL_BATCH_THRESHOLD:
+            parsed = [self._parse_uncached(key[0]) for _, key in misses]
+        else:
+            workers = os.cpu_count() or 1
+            chunksize = max(1, len(misses) // (workers * 4))
+            parsed = list(self._get_executor().map(
+                _parse_one, [key[0] for _, key in misses], chunksize=chunksize
+            ))
         
-        for file_path in file_paths:
-            result = self.parse_file(file_path)
-            results.append(result)
+        for (i, key), result in zip(misses, parsed):
+            results[i] = result
+            self._cache_put(key, result)
         
         total_blocks = sum(r.get('total_blocks', 0) for r in results if r.get('status') == 'success')
         
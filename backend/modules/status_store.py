@@ -0,0 +1,145 @@
+import asyncio
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StatusStore:
+    """Stores project processing status in SQLite so every server worker sees the same state"""
+    
+    def __init__(self, db_path: str = "output/status.db", ttl_seconds: int = 86400,
+                 max_projects: int = 1000):
+        self.db_path = Path(db_path).resolve()
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_projects = max_projects
+        
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS project_status (
+                    project_id TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (project_id, field)
+                )"""
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+    
+    async def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a project
+        
+        Args:
+            project_id: Project identifier
+        
+        Returns:
+            Status dict, or None if the project is unknown or expired
+        """
+        return await asyncio.to_thread(self._get, project_id)
+    
+    async def set(self, project_id: str, status: Dict[str, Any]):
+        """Replace the whole status of a project"""
+        await asyncio.to_thread(self._write, project_id, status, True)
+    
+    async def update(self, project_id: str, **fields: Any):
+        """Update individual status fields, leaving the others untouched"""
+        await asyncio.to_thread(self._write, project_id, fields, False)
+    
+    async def delete_fields(self, project_id: str, *fields: str):
+        """Remove individual status fields"""
+        await asyncio.to_thread(self._delete_fields, project_id, fields)
+    
+    async def list_summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Get the status and message of every live project, keyed by project ID"""
+        return await asyncio.to_thread(self._list_summaries)
+    
+    async def prune(self) -> int:
+        """
+        Delete expired projects and the least recently updated ones beyond max_projects
+        
+        Returns:
+            Number of rows removed
+        """
+        return await asyncio.to_thread(self._prune)
+    
+    def _get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT field, value FROM project_status WHERE project_id = ? AND expires_at > ?",
+                (project_id, time.time())
+            ).fetchall()
+        
+        if not rows:
+            return None
+        return {field: json.loads(value) for field, value in rows}
+    
+    def _write(self, project_id: str, fields: Dict[str, Any], replace: bool):
+        expires_at = time.time() + self.ttl_seconds
+        rows = [
+            (project_id, field, json.dumps(value, default=str), expires_at)
+            for field, value in fields.items()
+        ]
+        
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if replace:
+                    conn.execute("DELETE FROM project_status WHERE project_id = ?", (project_id,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO project_status (project_id, field, value, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute(
+                    "UPDATE project_status SET expires_at = ? WHERE project_id = ?",
+                    (expires_at, project_id)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    
+    def _delete_fields(self, project_id: str, fields):
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "DELETE FROM project_status WHERE project_id = ? AND field = ?",
+                [(project_id, field) for field in fields]
+            )
+    
+    def _list_summaries(self) -> Dict[str, Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT project_id, field, value FROM project_status "
+                "WHERE expires_at > ? AND field IN ('status', 'message')",
+                (time.time(),)
+            ).fetchall()
+        
+        projects: Dict[str, Dict[str, Any]] = {}
+        for project_id, field, value in rows:
+            projects.setdefault(project_id, {})[field] = json.loads(value)
+        return projects
+    
+    def _prune(self) -> int:
+        with closing(self._connect()) as conn:
+            expired = conn.execute("DELETE FROM project_status WHERE expires_at <= ?", (time.time(),))
+            overflow = conn.execute(
+                """DELETE FROM project_status WHERE project_id IN (
+                    SELECT project_id FROM project_status
+                    GROUP BY project_id
+                    ORDER BY MAX(expires_at) DESC
+                    LIMIT -1 OFFSET ?
+                )""",
+                (self.max_projects,)
+            )
+            return expired.rowcount + overflow.rowcount
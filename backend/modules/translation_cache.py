@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_QUERY_CHUNK_SIZE = 500
+
+
+class TranslationCache:
+    """Bounded in-memory LRU of translations, backed by SQLite for reuse across runs
+    
+    Entries are keyed by the model that produced them, so output of one language pair's
+    model is never served for another pair.
+    """
+    
+    def __init__(self, db_path: str = "output/translation_cache.db", max_size: int = 10_000):
+        self.db_path = Path(db_path).resolve()
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = asyncio.Lock()
+        
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS model_translations (
+                    model TEXT NOT NULL,
+                    digest BLOB NOT NULL,
+                    translation TEXT NOT NULL,
+                    PRIMARY KEY (model, digest)
+                )"""
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+    
+    @staticmethod
+    def _key(model: str, text: str) -> Tuple[str, bytes]:
+        return model, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    async def get_many(self, model: str, texts: List[str]) -> List[Optional[str]]:
+        """
+        Look up cached translations
+        
+        Args:
+            model: Name of the model whose translations to look up
+            texts: Source texts
+        
+        Returns:
+            Cached translation for each text, or None where there is none
+        """
+        keys = [self._key(model, text) for text in texts]
+        results: List[Optional[str]] = [None] * len(keys)
+        missing = []
+        
+        async with self._lock:
+            for i, key in enumerate(keys):
+                translation = self._entries.get(key)
+                if translation is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    results[i] = translation
+        
+        if missing:
+            stored = await asyncio.to_thread(
+                self._load, model, [keys[i][1] for i in missing]
+            )
+            if stored:
+                async with self._lock:
+                    for i in missing:
+                        translation = stored.get(keys[i][1])
+                        if translation is not None:
+                            results[i] = translation
+                            self._remember(keys[i], translation)
+        
+        return results
+    
+    async def put_many(self, model: str, texts: List[str], translations: List[str]):
+        """Store translations that the given model produced for the source texts"""
+        keys = [self._key(model, text) for text in texts]
+        
+        async with self._lock:
+            for key, translation in zip(keys, translations):
+                self._remember(key, translation)
+        
+        await asyncio.to_thread(self._store, keys, translations)
+    
+    def _remember(self, key: Tuple[str, bytes], translation: str):
+        self._entries[key] = translation
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def _load(self, model: str, digests: List[bytes]) -> Dict[bytes, str]:
+        stored = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(digests), _QUERY_CHUNK_SIZE):
+                chunk = digests[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = conn.execute(
+                    "SELECT digest, translation FROM model_translations "
+                    f"WHERE model = ? AND digest IN ({placeholders})",
+                    (model, *chunk)
+                ).fetchall()
+                stored.update(rows)
+        return stored
+    
+    def _store(self, keys: List[Tuple[str, bytes]], translations: List[str]):
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO model_translations (model, digest, translation) "
+                "VALUES (?, ?, ?)",
+                [(*key, translation) for key, translation in zip(keys, translations)]
+            )
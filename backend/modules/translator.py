@@ -1,32 +1,82 @@
 import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from types import MappingProxyType
 from typing import List, Dict, Optional
 import asyncio
 
+from .translation_cache import TranslationCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_PINNED_BUFFER_COUNT = 3
+
+# Texts with nothing to translate: only digits/punctuation/whitespace, or a short token like "API"
+_PASSTHRU = re.compile(r'[\W\d_]+|[A-Za-z]{1,3}')
+
+
+def _is_passthrough(text: str) -> bool:
+    return not text or _PASSTHRU.fullmatch(text) is not None
+
+
+def _cpu_has_native_bf16() -> bool:
+    """True on CPUs with AVX512-BF16 or AMX-BF16; elsewhere BF16 is emulated and slower than FP32"""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("flags"):
+                    flags = line.split(":", 1)[1].split()
+                    return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        pass
+    return False
+
 
 class TranslationEngine:
     """Translation engine supporting multiple backends"""
     
-    def __init__(self, model_type: str = "marian"):
+    supported_languages = MappingProxyType({
+        "en": "English",
+        "es": "Spanish",
+        "fr": "French",
+        "de": "German",
+        "it": "Italian",
+        "pt": "Portuguese",
+        "ru": "Russian",
+        "zh": "Chinese",
+        "ja": "Japanese",
+        "ko": "Korean",
+        "ar": "Arabic",
+        "hi": "Hindi"
+    })
+    
+    _LANGS_RESPONSE = MappingProxyType({
+        "status": "success",
+        "languages": supported_languages
+    })
+    
+    def __init__(self, model_type: str = "marian", model_cache_dir: str = "models",
+                 cache_path: str = "output/translation_cache.db"):
         self.model_type = model_type
+        self.model_cache_dir = Path(model_cache_dir)
+        self.cache = TranslationCache(cache_path)
         self.model = None
         self.tokenizer = None
-        self.supported_languages = {
-            "en": "English",
-            "es": "Spanish",
-            "fr": "French",
-            "de": "German",
-            "it": "Italian",
-            "pt": "Portuguese",
-            "ru": "Russian",
-            "zh": "Chinese",
-            "ja": "Japanese",
-            "ko": "Korean",
-            "ar": "Arabic",
-            "hi": "Hindi"
-        }
+        self.backend = None
+        self.model_name = None
+        self.device = "cpu"
+        self._pinned_buffers: List[Dict] = []
+        self._next_pinned_buffer = 0
+        self._pinned_lock = threading.Lock()
+        self._inference_checked = False
+        self._eager_forward = None
+        self._inference_fallback_lock = threading.Lock()
+        self._load_lock = asyncio.Lock()
         
     async def load_model(self, source_lang: str = "en", target_lang: str = "es"):
         """
@@ -38,16 +88,8 @@ class TranslationEngine:
         """
         try:
             if self.model_type == "marian":
-                from transformers import MarianMTModel, MarianTokenizer
-                
-                model_name = f"Helsinki-NLP/opus-mt-{source_lang}-{target_lang}"
-                logger.info(f"Loading model: {model_name}")
-                
-                self.tokenizer = MarianTokenizer.from_pretrained(model_name)
-                self.model = MarianMTModel.from_pretrained(model_name)
-                
-                logger.info("Model loaded successfully")
-                return {"status": "success", "model": model_name}
+                # Downloading and converting can take minutes; keep it off the event loop
+                return await asyncio.to_thread(self._load_marian_model, source_lang, target_lang)
             else:
                 return {"status": "error", "message": f"Unsupported model type: {self.model_type}"}
                 
@@ -58,6 +100,266 @@ class TranslationEngine:
                 "message": f"Model loading failed: {e}. Using mock translation for demo."
             }
     
+    def _load_marian_model(self, source_lang: str, target_lang: str) -> Dict:
+        """Load the MarianMT tokenizer and model, preferring the CTranslate2 backend"""
+        from transformers import MarianTokenizer
+        
+        model_name = f"Helsinki-NLP/opus-mt-{source_lang}-{target_lang}"
+        logger.info(f"Loading model: {model_name}")
+        
+        tokenizer = MarianTokenizer.from_pretrained(model_name)
+        try:
+            model = self._load_ctranslate2_model(model_name)
+            backend = "ctranslate2"
+        except Exception as e:
+            logger.warning(f"CTranslate2 unavailable ({e}), using Transformers for inference")
+            model = self._load_transformers_model(model_name)
+            backend = "transformers"
+        
+        self.tokenizer = tokenizer
+        self.model = model
+        self.backend = backend
+        self.model_name = model_name
+        
+        logger.info(f"Model loaded successfully ({self.backend})")
+        return {"status": "success", "model": model_name, "backend": self.backend}
+    
+    def _load_ctranslate2_model(self, model_name: str):
+        """
+        Load an int8-quantized CTranslate2 translator, converting the model on first use
+        
+        Args:
+            model_name: Hugging Face model name
+            
+        Returns:
+            ctranslate2.Translator instance
+        """
+        import ctranslate2
+        
+        model_dir = self.model_cache_dir / model_name.replace("/", "--")
+        if not (model_dir / "model.bin").exists():
+            self._convert_ctranslate2_model(model_name, model_dir)
+        
+        # Every server worker loads its own translator; share the cores between them
+        workers = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+        compute_type = "int8_float16" if ctranslate2.get_cuda_device_count() > 0 else "int8"
+        return ctranslate2.Translator(
+            str(model_dir),
+            device="auto",
+            compute_type=compute_type,
+            intra_threads=max(1, (os.cpu_count() or 1) // workers)
+        )
+    
+    def _convert_ctranslate2_model(self, model_name: str, model_dir: Path):
+        """
+        Convert a model to int8 CTranslate2 format and move it into place atomically
+        
+        The conversion writes into a private staging directory, so server workers converting
+        the same model at once never see (or delete) each other's partial output.
+        """
+        from ctranslate2.converters import TransformersConverter
+        
+        self.model_cache_dir.mkdir(parents=True, exist_ok=True)
+        staging_root = Path(tempfile.mkdtemp(prefix=f".{model_dir.name}-", dir=self.model_cache_dir))
+        try:
+            logger.info(f"Converting {model_name} to CTranslate2 (int8)")
+            staged_dir = staging_root / "model"
+            TransformersConverter(model_name).convert(str(staged_dir), quantization="int8")
+            
+            if model_dir.exists() and not (model_dir / "model.bin").exists():
+                # Leftover of an interrupted conversion
+                shutil.rmtree(model_dir, ignore_errors=True)
+            try:
+                os.replace(staged_dir, model_dir)
+            except OSError:
+                # Another worker moved its copy into place first
+                if not (model_dir / "model.bin").exists():
+                    raise
+        finally:
+            shutil.rmtree(staging_root, ignore_errors=True)
+    
+    def _load_transformers_model(self, model_name: str):
+        """
+        Load a MarianMTModel in half precision where the hardware supports it
+        
+        Uses FP16 on CUDA and BF16 on CPUs with native BF16 support, and FP32 otherwise.
+        On CUDA the forward pass is also compiled with torch.compile. Both are checked
+        on the first generate, and _infer drops them if that call fails.
+        
+        Args:
+            model_name: Hugging Face model name
+            
+        Returns:
+            MarianMTModel instance on self.device
+        """
+        import torch
+        from transformers import MarianMTModel
+        
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if self.device == "cuda":
+            dtype = torch.float16
+        elif _cpu_has_native_bf16():
+            dtype = torch.bfloat16
+        else:
+            dtype = torch.float32
+        
+        try:
+            model = MarianMTModel.from_pretrained(model_name, torch_dtype=dtype)
+        except Exception as e:
+            if dtype == torch.float32:
+                raise
+            logger.warning(f"Could not load {model_name} as {dtype}, using float32: {e}")
+            model = MarianMTModel.from_pretrained(model_name)
+        
+        model = model.to(self.device).eval()
+        self._inference_checked = False
+        self._eager_forward = None
+        
+        if self.device == "cuda":
+            self._pinned_buffers = [{"event": torch.cuda.Event()} for _ in range(_PINNED_BUFFER_COUNT)]
+            
+            # generate() drives forward() once per token; compiling forward cuts the per-step overhead.
+            # The default mode: CUDA graphs would be re-recorded for every KV-cache length.
+            try:
+                eager_forward = model.forward
+                model.forward = torch.compile(eager_forward, dynamic=True)
+                self._eager_forward = eager_forward
+            except Exception as e:
+                logger.warning(f"torch.compile unavailable, running eagerly: {e}")
+        
+        return model
+    
+    def _tokenize(self, texts: List[str]):
+        """Prepare one batch of texts as model inputs"""
+        if self.backend == "ctranslate2":
+            return [
+                self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(text, truncation=True))
+                for text in texts
+            ]
+        encoded = self.tokenizer(texts, return_tensors="np", padding=True, truncation=True)
+        return self._to_device(encoded)
+    
+    def _to_device(self, encoded) -> Dict:
+        """
+        Move tokenized arrays to the model's device
+        
+        On CUDA the arrays are staged through reusable pinned host buffers so the copy
+        can run asynchronously instead of allocating pageable tensors for every batch.
+        """
+        import torch
+        
+        tensors = {name: torch.from_numpy(array) for name, array in encoded.items()}
+        if not self._pinned_buffers:
+            return tensors
+        
+        with self._pinned_lock:
+            slot = self._pinned_buffers[self._next_pinned_buffer]
+            self._next_pinned_buffer = (self._next_pinned_buffer + 1) % len(self._pinned_buffers)
+            
+            # Wait until the previous copy out of this buffer has finished before overwriting it
+            slot["event"].synchronize()
+            
+            on_device = {}
+            for name, tensor in tensors.items():
+                buffer = slot.get(name)
+                if buffer is None or buffer.numel() < tensor.numel() or buffer.dtype != tensor.dtype:
+                    buffer = torch.empty(tensor.numel(), dtype=tensor.dtype, pin_memory=True)
+                    slot[name] = buffer
+                
+                staged = buffer[:tensor.numel()].view(tensor.shape)
+                staged.copy_(tensor)
+                on_device[name] = staged.to(self.device, non_blocking=True)
+            
+            slot["event"].record()
+        
+        return on_device
+    
+    def _infer(self, inputs):
+        """Run the model on tokenized inputs"""
+        if self.backend == "ctranslate2":
+            return self.model.translate_batch(inputs, max_batch_size=len(inputs), beam_size=4)
+        
+        # Compile errors and unsupported half-precision kernels only show up once generate
+        # runs, so a failing first call drops those optimizations one at a time
+        while True:
+            try:
+                return self._generate(inputs)
+            except Exception as e:
+                if self._inference_checked or not self._drop_optimization(e):
+                    raise
+    
+    def _generate(self, inputs):
+        import torch
+        
+        with torch.inference_mode():
+            outputs = self.model.generate(**inputs)
+        self._inference_checked = True
+        return outputs
+    
+    def _drop_optimization(self, error: Exception) -> bool:
+        """Undo torch.compile, then reduced precision; returns False when nothing is left to undo"""
+        import torch
+        
+        with self._inference_fallback_lock:
+            if self._eager_forward is not None:
+                logger.warning(f"Compiled generation failed, running eagerly: {error}")
+                self.model.forward = self._eager_forward
+                self._eager_forward = None
+                return True
+            if self.model.dtype != torch.float32:
+                logger.warning(f"Generation in {self.model.dtype} failed, switching to float32: {error}")
+                self.model = self.model.float()
+                return True
+        return False
+    
+    def _decode(self, outputs) -> List[str]:
+        """Turn model outputs back into text"""
+        if self.backend == "ctranslate2":
+            outputs = [self.tokenizer.convert_tokens_to_ids(result.hypotheses[0]) for result in outputs]
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    def _translate_texts(self, texts: List[str]) -> List[str]:
+        """Run the loaded model on one batch of texts"""
+        return self._decode(self._infer(self._tokenize(texts)))
+    
+    async def _translate_pipelined(self, batches: List[List[str]]) -> List[str]:
+        """
+        Translate batches in worker threads, tokenizing ahead while the model runs
+        
+        Args:
+            batches: Batches of texts to translate
+            
+        Returns:
+            Translated texts, flattened in batch order
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        
+        async def tokenize_batches():
+            try:
+                for batch in batches:
+                    await queue.put(await asyncio.to_thread(self._tokenize, batch))
+                await queue.put(None)
+            except Exception as e:
+                await queue.put(e)
+        
+        producer = asyncio.create_task(tokenize_batches())
+        translated_texts = []
+        try:
+            for i in range(len(batches) + 1):
+                inputs = await queue.get()
+                if inputs is None:
+                    break
+                if isinstance(inputs, Exception):
+                    raise inputs
+                
+                outputs = await asyncio.to_thread(self._infer, inputs)
+                translated_texts.extend(await asyncio.to_thread(self._decode, outputs))
+                logger.info(f"Translated batch {i + 1}/{len(batches)}")
+        finally:
+            producer.cancel()
+        
+        return translated_texts
+    
     async def translate_text(self, text: str, source_lang: str = "en", 
                             target_lang: str = "es") -> Dict:
         """
@@ -72,16 +374,19 @@ class TranslationEngine:
             Dict with translated text
         """
         try:
-            if not text or not text.strip():
+            if _is_passthrough(text) or source_lang == target_lang:
                 return {"status": "success", "translated_text": text}
             
-            if self.model is None or self.tokenizer is None:
-                await self.load_model(source_lang, target_lang)
+            async with self._load_lock:
+                if self.model is None or self.tokenizer is None:
+                    await self.load_model(source_lang, target_lang)
             
             if self.model and self.tokenizer:
-                inputs = self.tokenizer([text], return_tensors="pt", padding=True)
-                translated = self.model.generate(**inputs)
-                translated_text = self.tokenizer.decode(translated[0], skip_special_tokens=True)
+                # Cache under the loaded model: it may serve another pair than the one requested
+                translated_text = (await self.cache.get_many(self.model_name, [text]))[0]
+                if translated_text is None:
+                    translated_text = (await asyncio.to_thread(self._translate_texts, [text]))[0]
+                    await self.cache.put_many(self.model_name, [text], [translated_text])
                 
                 return {
                     "status": "success",
@@ -110,7 +415,8 @@ class TranslationEngine:
             }
     
     async def translate_batch(self, texts: List[str], source_lang: str = "en", 
-                             target_lang: str = "es", batch_size: int = 8) -> Dict:
+                             target_lang: str = "es", batch_size: int = 8,
+                             max_batch_chars: int = 4000) -> Dict:
         """
         Translate multiple text blocks in batches
         
@@ -118,32 +424,67 @@ class TranslationEngine:
             texts: List of texts to translate
             source_lang: Source language code
             target_lang: Target language code
-            batch_size: Number of texts to process at once
+            batch_size: Maximum number of texts to process at once
+            max_batch_chars: Maximum total characters per batch
             
         Returns:
             Dict with translation results
         """
         try:
-            if self.model is None or self.tokenizer is None:
-                await self.load_model(source_lang, target_lang)
+            if source_lang == target_lang:
+                return {
+                    "status": "success",
+                    "total_texts": len(texts),
+                    "translated_texts": list(texts),
+                    "source_lang": source_lang,
+                    "target_lang": target_lang
+                }
             
-            translated_texts = []
+            async with self._load_lock:
+                if self.model is None or self.tokenizer is None:
+                    await self.load_model(source_lang, target_lang)
             
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                
-                if self.model and self.tokenizer:
-                    inputs = self.tokenizer(batch, return_tensors="pt", padding=True, truncation=True)
-                    translated = self.model.generate(**inputs)
-                    
-                    for j, translation in enumerate(translated):
-                        translated_text = self.tokenizer.decode(translation, skip_special_tokens=True)
-                        translated_texts.append(translated_text)
-                else:
+            use_model = bool(self.model and self.tokenizer)
+            
+            # Only translate each distinct text once, and skip those already cached
+            if use_model:
+                # Cache under the loaded model: it may serve another pair than the one requested
+                translated_texts = await self.cache.get_many(self.model_name, texts)
+            else:
+                translated_texts = [None] * len(texts)
+            for i, text in enumerate(texts):
+                if _is_passthrough(text):
+                    translated_texts[i] = text
+            pending = list(dict.fromkeys(
+                text for text, translated_text in zip(texts, translated_texts) if translated_text is None
+            ))
+            
+            # Batch texts of similar length together so little compute goes to padding
+            order = self._length_order(pending)
+            sorted_translations = []
+            batches = self._make_batches([pending[i] for i in order], batch_size, max_batch_chars)
+            
+            if use_model:
+                sorted_translations = await self._translate_pipelined(batches)
+            else:
+                for i, batch in enumerate(batches):
                     for text in batch:
-                        translated_texts.append(f"[{target_lang.upper()}] {text}")
-                
-                logger.info(f"Translated batch {i // batch_size + 1}/{(len(texts) + batch_size - 1) // batch_size}")
+                        sorted_translations.append(f"[{target_lang.upper()}] {text}")
+                    
+                    logger.info(f"Translated batch {i + 1}/{len(batches)}")
+            
+            new_translations = [None] * len(pending)
+            for position, translated_text in zip(order, sorted_translations):
+                new_translations[position] = translated_text
+            
+            if use_model and pending:
+                await self.cache.put_many(self.model_name, pending, new_translations)
+            
+            new_by_text = dict(zip(pending, new_translations))
+            translated_texts = [
+                translated_text if translated_text is not None else new_by_text[text]
+                for text, translated_text in zip(texts, translated_texts)
+            ]
             
             return {
                 "status": "success",
@@ -160,6 +501,34 @@ class TranslationEngine:
                 "message": str(e)
             }
     
+    def _length_order(self, texts: List[str]) -> List[int]:
+        """
+        Get the indices of texts sorted by length
+        
+        Character length tracks token length closely enough for bucketing, and avoids
+        tokenizing every text an extra time on the event loop.
+        """
+        return sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    
+    def _make_batches(self, texts: List[str], batch_size: int, max_batch_chars: int) -> List[List[str]]:
+        """Group texts into batches bounded by both item count and total characters"""
+        batches = []
+        batch = []
+        batch_chars = 0
+        
+        for text in texts:
+            if batch and (len(batch) >= batch_size or batch_chars + len(text) > max_batch_chars):
+                batches.append(batch)
+                batch = []
+                batch_chars = 0
+            batch.append(text)
+            batch_chars += len(text)
+        
+        if batch:
+            batches.append(batch)
+        
+        return batches
+    
     async def translate_document(self, parsed_content: Dict, source_lang: str = "en",
                                 target_lang: str = "es") -> Dict:
         """
@@ -173,53 +542,83 @@ class TranslationEngine:
         Returns:
             Dict with translated document
         """
-        try:
-            if parsed_content.get("status") != "success":
-                return {"status": "error", "message": "Invalid parsed content"}
-            
-            translatable_blocks = parsed_content.get("translatable_blocks", [])
-            texts = [block["content"] for block in translatable_blocks]
-            
-            if not texts:
-                return {
-                    "status": "success",
-                    "message": "No translatable content found",
-                    "translated_content": parsed_content
-                }
+        results = await self.translate_documents([parsed_content], source_lang, target_lang)
+        return results[0]
+    
+    async def translate_documents(self, parsed_contents: List[Dict], source_lang: str = "en",
+                                 target_lang: str = "es") -> List[Dict]:
+        """
+        Translate several parsed documents, pooling their blocks into shared batches
+        
+        Args:
+            parsed_contents: Parsed contents from ContentParser
+            source_lang: Source language code
+            target_lang: Target language code
             
-            translation_result = await self.translate_batch(texts, source_lang, target_lang)
+        Returns:
+            List of translated document dicts, in the same order as the input
+        """
+        try:
+            results: List[Optional[Dict]] = [None] * len(parsed_contents)
+            texts = []
+            spans = []
             
-            if translation_result.get("status") in ["success", "mock"]:
-                translated_texts = translation_result["translated_texts"]
+            for i, parsed_content in enumerate(parsed_contents):
+                if parsed_content.get("status") != "success":
+                    results[i] = {"status": "error", "message": "Invalid parsed content"}
+                    continue
                 
-                for i, block in enumerate(translatable_blocks):
-                    if i < len(translated_texts):
-                        block["translated_content"] = translated_texts[i]
-                        block["original_content"] = block["content"]
+                block_contents = parsed_content.get("block_contents", [])
+                if not block_contents:
+                    results[i] = {
+                        "status": "success",
+                        "message": "No translatable content found",
+                        "translated_content": parsed_content
+                    }
+                    continue
                 
-                translated_content = parsed_content.copy()
-                translated_content["translatable_blocks"] = translatable_blocks
-                translated_content["translation_metadata"] = {
-                    "source_lang": source_lang,
-                    "target_lang": target_lang,
-                    "total_blocks": len(translatable_blocks),
-                    "status": translation_result.get("status")
-                }
+                spans.append((i, len(texts), len(block_contents)))
+                texts.extend(block_contents)
+            
+            if spans:
+                translation_result = await self.translate_batch(texts, source_lang, target_lang)
                 
-                return {
-                    "status": "success",
-                    "translated_content": translated_content
-                }
-            else:
-                return translation_result
+                for i, start, count in spans:
+                    if translation_result.get("status") in ["success", "mock"]:
+                        results[i] = self._apply_translations(
+                            parsed_contents[i],
+                            translation_result["translated_texts"][start:start + count],
+                            source_lang,
+                            target_lang,
+                            translation_result.get("status")
+                        )
+                    else:
+                        results[i] = translation_result
+            
+            return results
                 
         except Exception as e:
             logger.error(f"Document translation error: {e}")
-            return {"status": "error", "message": str(e)}
+            return [{"status": "error", "message": str(e)} for _ in parsed_contents]
     
-    def get_supported_languages(self) -> Dict:
-        """Get list of supported languages"""
+    def _apply_translations(self, parsed_content: Dict, translated_texts: List[str],
+                            source_lang: str, target_lang: str, status: Optional[str]) -> Dict:
+        """Attach translated texts to a document as a list parallel to its block_contents"""
+        # Shallow copy only: parsed content may be shared (e.g. the parser's cache)
+        translated_content = parsed_content.copy()
+        translated_content["translated_contents"] = list(translated_texts)
+        translated_content["translation_metadata"] = {
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "total_blocks": len(parsed_content.get("block_contents", [])),
+            "status": status
+        }
+        
         return {
             "status": "success",
-            "languages": self.supported_languages
+            "translated_content": translated_content
         }
+    
+    def get_supported_languages(self) -> MappingProxyType:
+        """Get list of supported languages (a shared read-only mapping)"""
+        return self._LANGS_RESPONSE